@@ -5,15 +5,47 @@
 """ Inspect a Prisma Cloud Tenant """
 
 import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+from itertools import chain
 import json
 import os
+from pathlib import Path
 import re
-from shutil import which
+from shutil import copyfileobj, which
 import sys
+import time
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
+import xlsxwriter
+
+# Prefer orjson (a faster JSON parser and serializer) when available.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Cache query results on disk when diskcache is available.
+try:
+    from diskcache import Cache
+except ImportError:
+    Cache = None
+
+# Prefer ijson (a streaming parser), or pysimdjson (a lazy, on-demand parser), for the Alerts file when available.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
 
 ##########################################################################################
 # Process arguments / parameters.
@@ -58,6 +90,10 @@ pc_parser.add_argument('-sa', '--support_api',
     action='store_true',
     help='(Optional) Use the Support API to collect data without needing a Tenant API Key')
 
+pc_parser.add_argument('-nc', '--no_cache',
+    action='store_true',
+    help='(Optional) Ignore cached query results (requires the diskcache library) and query the API.')
+
 pc_parser.add_argument('-d', '--debug',
     action='store_true',
     help='(Optional) Enable debugging.')
@@ -71,10 +107,27 @@ argz = pc_parser.parse_args()
 def output(output_data=''):
     print(output_data)
 
+# Format (and output) only when debugging.
+
+def debug_output(output_format, *output_args):
+    if CONFIG['DEBUG_MODE']:
+        output(output_format % output_args)
+
+json_loads = orjson.loads if orjson else json.loads
+
+# Returns bytes, indented (for readability) only when requested.
+
+def json_dumps(data, indent=False):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None).encode('utf-8')
+
 ##########################################################################################
 # Configure.
 ##########################################################################################
 
+NON_WORD_CHARACTERS = re.compile(r'\W+')
+
 def configure(args):
     config = {}
     config['DEBUG_MODE']          = args.debug
@@ -85,6 +138,7 @@ def configure(args):
     config['PRISMA_SECRET_KEY']   = args.secret_key # or os.environ.get('PRISMA_SECRET_KEY')
     config['PRISMA_API_HEADERS']  = {
         'Accept': 'application/json; charset=UTF-8, text/plain, */*',
+        'Accept-Encoding': 'gzip, deflate',
         'Content-Type': 'application/json'
     }
     config['API_TIMEOUTS']      = (60, 600) # (CONNECT, READ)
@@ -92,19 +146,25 @@ def configure(args):
     config['CLOUD_ACCOUNT_ID']  = args.cloud_account
     config['TIME_RANGE_AMOUNT'] = args.time_range_amount
     config['TIME_RANGE_UNIT']   = args.time_range_unit
-    config['TIME_RANGE_LABEL']  = 'Past %s %s' % (config['TIME_RANGE_AMOUNT'], config['TIME_RANGE_UNIT'].capitalize())
-    config['CUSTOMER_PREFIX']   = re.sub(r'\W+', '', config['CUSTOMER_NAME']).lower()
+    config['TIME_RANGE_LABEL']  = f"Past {config['TIME_RANGE_AMOUNT']} {config['TIME_RANGE_UNIT'].capitalize()}"
+    config['CUSTOMER_PREFIX']   = NON_WORD_CHARACTERS.sub('', config['CUSTOMER_NAME']).lower()
+    customer_prefix = config['CUSTOMER_PREFIX']
     config['RESULTS_FILE'] = {
-        'ASSETS':       '%s-assets.json'        % config['CUSTOMER_PREFIX'],
-        'POLICIES':     '%s-policies.json'      % config['CUSTOMER_PREFIX'],
-        'ALERTS':       '%s-alerts.json'        % config['CUSTOMER_PREFIX'],
-        'USERS':        '%s-users.json'         % config['CUSTOMER_PREFIX'],
-        'ACCOUNTS':     '%s-accounts.json'      % config['CUSTOMER_PREFIX'],
-        'GROUPS':       '%s-groups.json'        % config['CUSTOMER_PREFIX'],
-        'RULES':        '%s-rules.json'         % config['CUSTOMER_PREFIX'],
-        'INTEGRATIONS': '%s-integrations.json'  % config['CUSTOMER_PREFIX']
+        'ASSETS':       f'{customer_prefix}-assets.json',
+        'POLICIES':     f'{customer_prefix}-policies.json',
+        'ALERTS':       f'{customer_prefix}-alerts.json',
+        'USERS':        f'{customer_prefix}-users.json',
+        'ACCOUNTS':     f'{customer_prefix}-accounts.json',
+        'GROUPS':       f'{customer_prefix}-groups.json',
+        'RULES':        f'{customer_prefix}-rules.json',
+        'INTEGRATIONS': f'{customer_prefix}-integrations.json'
     }
-    config['OUTPUT_FILE_XLS'] = '%s.xls' % config['CUSTOMER_PREFIX']
+    config['OUTPUT_FILE_XLSX']  = f'{customer_prefix}.xlsx'
+    config['AUTOFIT_MAX_ROWS']  = 50000
+    config['AUTOFIT_MAX_WIDTH'] = 80
+    config['CACHE_DIRECTORY']   = os.path.expanduser('~/.pcs-inspect-cache')
+    config['CACHE_EXPIRE']      = 3600 # Seconds
+    config['USE_CACHE']         = not args.no_cache
     if config['RUN_MODE'] in ['auto', 'collect'] :
         if not config['PRISMA_API_ENDPOINT']:
             output("Error: '--url' is required")
@@ -126,51 +186,72 @@ def delete_file_if_exists(file_name):
         os.remove(file_name)
 
 def open_sheet(file_name):
-    # pylint: disable=abstract-class-instantiated
-    return pd.ExcelWriter(file_name, engine='xlsxwriter')
-
-def write_sheet(panda_writer, this_sheet_name, rows):
-    dataframe = pd.DataFrame.from_records(rows)
-    dataframe.to_excel(panda_writer, sheet_name=this_sheet_name, header=False, index=False)
-    this_sheet = panda_writer.sheets[this_sheet_name]
-    # Approximate autofit column width.
-    for idx, column in enumerate(dataframe): # Loop through the columns.
-        dataframe_series = dataframe[column]
-        column_width = max(
-            dataframe_series.astype(str).map(len).max(), # Length of largest cell
-            len(str(dataframe_series.name))              # Length of column header / name
-            )
-        this_sheet.set_column(idx, idx, column_width)
+    # Write rows directly (without a DataFrame), flushing each row to disk as it is written.
+    return xlsxwriter.Workbook(file_name, {'constant_memory': True})
+
+def write_sheet(workbook, this_sheet_name, rows):
+    # Rows can be any iterable (including a generator), as each row is written as it is read.
+    if CONFIG['DEBUG_MODE']:
+        rows = list(rows)
+    this_sheet = workbook.add_worksheet(this_sheet_name)
+    # Approximate autofit column width, calculated while writing the rows.
+    # Sample the first rows of large worksheets, and limit the width of long values (URLs, UUIDs).
+    column_widths = []
+    for row_idx, row in enumerate(rows):
+        this_sheet.write_row(row_idx, 0, row)
+        if row_idx >= CONFIG['AUTOFIT_MAX_ROWS']:
+            continue
+        for idx, cell in enumerate(row):
+            cell_width = len(cell) if isinstance(cell, str) else len(str(cell))
+            if idx == len(column_widths):
+                column_widths.append(cell_width)
+            elif cell_width > column_widths[idx]:
+                column_widths[idx] = cell_width
+    for idx, column_width in enumerate(column_widths):
+        this_sheet.set_column(idx, idx, min(column_width, CONFIG['AUTOFIT_MAX_WIDTH']))
     if CONFIG['DEBUG_MODE']:
         output(this_sheet_name)
         output()
         pd.set_option('display.max_rows', None)
-        output(dataframe)
+        output(pd.DataFrame.from_records(rows))
         output()
 
-def save_sheet(panda_writer):
-    panda_writer.save()
+def save_sheet(workbook):
+    workbook.close()
 
 ##########################################################################################
 # API Helpers.
 ##########################################################################################
 
-def make_api_call(method, url, requ_data=None):
-    if CONFIG['DEBUG_MODE']:
-        output('URL: %s' % url)
-        output('METHOD: %s' % method)
-        output('REQUEST DATA: %s' % requ_data)
+# Share one Session (and its pool of keep-alive connections) across all API calls, including concurrent calls.
+# Retry connection errors and throttled/unavailable responses, but only for idempotent methods (the default).
+
+def create_session():
+    sess = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries)
+    sess.mount('https://', adapter)
+    sess.mount('http://', adapter)
+    return sess
+
+# Specify stream_to (a file name) to write the response to that file as it is received, instead of returning it.
+
+def make_api_call(method, url, json_body=None, stream_to=None):
+    debug_output('URL: %s', url)
+    debug_output('METHOD: %s', method)
+    debug_output('REQUEST DATA: %s', json_body)
+    requ_data = None if json_body is None else json_dumps(json_body)
     try:
-        requ = requests.Request(method, url, data=requ_data, headers=CONFIG['PRISMA_API_HEADERS'])
-        prep = requ.prepare()
-        sess = requests.Session()
         # GlobalProtect generates 'ignore self signed certificate in certificate chain' errors.
         # Set 'REQUESTS_CA_BUNDLE' to a valid CA bundle including the 'Palo Alto Networks Inc Root CA' used by GlobalProtect.
         # Hint: Copy the bundle provided by the certifi module (locate via 'python -m certifi') and append the 'Palo Alto Networks Inc Root CA'
-        if 'REQUESTS_CA_BUNDLE' in os.environ:
-            resp = sess.send(prep, timeout=(CONFIG['API_TIMEOUTS']), verify="%s" % os.environ['REQUESTS_CA_BUNDLE'])
-        else:
-            resp = sess.send(prep, timeout=(CONFIG['API_TIMEOUTS']))
+        resp = SESSION.request(method, url, data=requ_data, headers=CONFIG['PRISMA_API_HEADERS'], timeout=(CONFIG['API_TIMEOUTS']), verify=os.environ.get('REQUESTS_CA_BUNDLE', True), stream=stream_to is not None)
+        if resp.ok and stream_to:
+            with open(stream_to, 'wb') as result_file:
+                for chunk in resp.iter_content(chunk_size=1048576):
+                    result_file.write(chunk)
+            return None
+        # Avoid decoding the (potentially large) response body unless debugging.
         if CONFIG['DEBUG_MODE']:
             output(resp.text)
         if resp.ok:
@@ -188,12 +269,12 @@ def make_api_call(method, url, requ_data=None):
 ####
 
 def get_prisma_login():
-    request_data = json.dumps({
+    body_params = {
         "username": CONFIG['PRISMA_ACCESS_KEY'],
         "password": CONFIG['PRISMA_SECRET_KEY']
-    })
-    api_response = make_api_call('POST', '%s/login' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
-    resp_data = json.loads(api_response)
+    }
+    api_response = make_api_call('POST', '%s/login' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
+    resp_data = json_loads(api_response)
     token = resp_data.get('token')
     if not token:
         output('Error with API Login: %s' % resp_data)
@@ -211,9 +292,8 @@ def get_assets(output_file_name):
         if CONFIG['CLOUD_ACCOUNT_ID']:
             body_params["accountIds"] = ["%s" % CONFIG['CLOUD_ACCOUNT_ID']]
         body_params['timeRange'] = {"value": {"unit": "%s" % CONFIG['TIME_RANGE_UNIT'], "amount": CONFIG['TIME_RANGE_AMOUNT']}, "type": "relative"}
-        request_data = json.dumps(body_params)
-        api_response = make_api_call('POST', '%s/_support/timeline/resource' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
-        api_response_json = json.loads(api_response)
+        api_response = make_api_call('POST', '%s/_support/timeline/resource' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
+        api_response_json = json_loads(api_response)
         if api_response_json and 'resources' in api_response_json[0]:
             api_response = bytes('{"summary": {"totalResources": %s}}' % api_response_json[0]['resources'], 'utf-8')
         else:
@@ -224,9 +304,7 @@ def get_assets(output_file_name):
         else:
             query_params = 'timeType=%s&timeAmount=%s&timeUnit=%s' % ('relative', CONFIG['TIME_RANGE_AMOUNT'], CONFIG['TIME_RANGE_UNIT'])
         api_response = make_api_call('GET', '%s/v2/inventory?%s' % (CONFIG['PRISMA_API_ENDPOINT'], query_params))
-    result_file = open(output_file_name, 'wb')
-    result_file.write(api_response)
-    result_file.close()
+    Path(output_file_name).write_bytes(api_response)
     # This returns a dictionary instead of a list.
 
 # SUPPORT_API_MODE:
@@ -238,13 +316,10 @@ def get_policies(output_file_name):
     delete_file_if_exists(output_file_name)
     if CONFIG['SUPPORT_API_MODE']:
         body_params = {"customerName": "%s" % CONFIG['CUSTOMER_NAME']}
-        request_data = json.dumps(body_params)
-        api_response = make_api_call('POST', '%s/_support/policy' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
+        api_response = make_api_call('POST', '%s/_support/policy' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
     else:
         api_response = make_api_call('GET', '%s/policy' % CONFIG['PRISMA_API_ENDPOINT'])
-    result_file = open(output_file_name, 'wb')
-    result_file.write(api_response)
-    result_file.close()
+    Path(output_file_name).write_bytes(api_response)
 
 # SUPPORT_API_MODE:
 # This script depends upon the not implemented '/_support/alert/jobs' endpoint.
@@ -253,50 +328,53 @@ def get_policies(output_file_name):
 def get_alerts(output_file_name):
     delete_file_if_exists(output_file_name)
     if CONFIG['SUPPORT_API_MODE']:
-        api_response = {}
-        api_response['by_policy']          = json.loads(get_alerts_aggregate('policy.name'))
-        api_response['by_policy_type']     = json.loads(get_alerts_aggregate('policy.type'))
-        api_response['by_policy_severity'] = json.loads(get_alerts_aggregate('policy.severity'))
-        api_response['by_alert.status']    = json.loads(get_alerts_aggregate('alert.status'))
-        api_response_json = json.dumps(api_response, indent=2, separators=(', ', ': '))
-        result_file = open(output_file_name, 'w', encoding='utf8')
-        result_file.write(api_response_json)
-        result_file.close()
+        group_by_fields = {
+            'by_policy':          'policy.name',
+            'by_policy_type':     'policy.type',
+            'by_policy_severity': 'policy.severity',
+            'by_alert.status':    'alert.status'
+        }
+        # These queries are independent, so run them concurrently.
+        with ThreadPoolExecutor(max_workers=len(group_by_fields)) as executor:
+            futures = {key: executor.submit(get_alerts_aggregate, group_by_field) for key, group_by_field in group_by_fields.items()}
+            api_response = {key: json_loads(future.result()) for key, future in futures.items()}
+        Path(output_file_name).write_bytes(json_dumps(api_response, indent=CONFIG['DEBUG_MODE']))
         # This returns a dictionary (of Open Alerts) instead of a list.
     else:
         body_params = {}
         body_params['timeRange'] = {"value": {"unit": "%s" % CONFIG['TIME_RANGE_UNIT'], "amount": CONFIG['TIME_RANGE_AMOUNT']}, "type": "relative"}
         if CONFIG['CLOUD_ACCOUNT_ID']:
             body_params["filters"] = [{"name": "cloud.accountId","value": "%s" % CONFIG['CLOUD_ACCOUNT_ID'], "operator": "="}]
-        request_data = json.dumps(body_params)
-        api_response = make_api_call('POST', '%s/alert/jobs' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
-        api_response_json = json.loads(api_response)
+        api_response = make_api_call('POST', '%s/alert/jobs' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
+        api_response_json = json_loads(api_response)
         if not 'id' in api_response_json:
             output("Error with '/alert/jobs' API: 'id' missing from response: %s" % api_response_json)
             return
         alert_job_id = api_response_json['id']
         api_response = make_api_call('GET', '%s/alert/jobs/%s/status' % (CONFIG['PRISMA_API_ENDPOINT'], alert_job_id))
-        api_response_json = json.loads(api_response)
+        api_response_json = json_loads(api_response)
         if not 'status' in api_response_json:
             output("Error with '/alert/jobs' API: 'status' missing from response: %s" % api_response_json)
             return
         alert_job_status = api_response_json['status']
+        # Poll with exponential backoff.
+        poll_delay = 2.0
         while alert_job_status == 'IN_PROGRESS':
-            output('Checking: %s' % alert_job_status)
             if CONFIG['DEBUG_MODE']:
+                output('Checking: %s' % alert_job_status)
                 output(api_response_json)
                 output()
+            time.sleep(poll_delay)
+            poll_delay = min(poll_delay * 1.5, 30.0)
             api_response = make_api_call('GET', '%s/alert/jobs/%s/status' % (CONFIG['PRISMA_API_ENDPOINT'], alert_job_id))
-            api_response_json = json.loads(api_response)
+            api_response_json = json_loads(api_response)
             if not 'status' in api_response_json:
                 output("Error with '/alert/jobs' API: 'status' missing from response: %s" % api_response_json)
                 return
             alert_job_status = api_response_json['status']
         if alert_job_status == 'READY_TO_DOWNLOAD':
-            api_response = make_api_call('GET', '%s/alert/jobs/%s/download' % (CONFIG['PRISMA_API_ENDPOINT'], alert_job_id))
-            result_file = open(output_file_name, 'wb')
-            result_file.write(api_response)
-            result_file.close()
+            # The list of Alerts can be large, so write it to the file as it is received.
+            make_api_call('GET', '%s/alert/jobs/%s/download' % (CONFIG['PRISMA_API_ENDPOINT'], alert_job_id), stream_to=output_file_name)
         else:
             output("Error with '/alert/jobs' API: 'status' in response not in ('IN_PROGRESS','READY_TO_DOWNLOAD'): %s" % api_response_json)
         # This returns a list (of Open and Closed Alerts).
@@ -311,8 +389,7 @@ def get_alerts_aggregate(group_by_field):
     body_params['timeRange'] = {"value": {"unit": "%s" % CONFIG['TIME_RANGE_UNIT'], "amount": CONFIG['TIME_RANGE_AMOUNT']}, "type": "relative"}
     body_params['groupBy'] = group_by_field
     body_params['limit'] = 9999
-    request_data = json.dumps(body_params)
-    api_response = make_api_call('POST', '%s/_support/alert/aggregate' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
+    api_response = make_api_call('POST', '%s/_support/alert/aggregate' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
     return api_response
 
 ####
@@ -321,13 +398,10 @@ def get_users(output_file_name):
     delete_file_if_exists(output_file_name)
     if CONFIG['SUPPORT_API_MODE']:
         body_params = {"customerName": "%s" % CONFIG['CUSTOMER_NAME']}
-        request_data = json.dumps(body_params)
-        api_response = make_api_call('POST', '%s/v2/_support/user' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
+        api_response = make_api_call('POST', '%s/v2/_support/user' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
     else:
         api_response = make_api_call('GET', '%s/v2/user' % CONFIG['PRISMA_API_ENDPOINT'])
-    result_file = open(output_file_name, 'wb')
-    result_file.write(api_response)
-    result_file.close()
+    Path(output_file_name).write_bytes(api_response)
 
 ####
 
@@ -336,33 +410,30 @@ def get_accounts(output_file_name):
     account_list = []
     if CONFIG['SUPPORT_API_MODE']:
         body_params = {"customerName": "%s" % CONFIG['CUSTOMER_NAME']}
-        request_data = json.dumps(body_params)
-        api_response = make_api_call('POST', '%s/_support/cloud' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
-        api_response_json = json.loads(api_response)
+        api_response = make_api_call('POST', '%s/_support/cloud' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
+        api_response_json = json_loads(api_response)
         for account in api_response_json:
             if account['numberOfChildAccounts'] > 0:    # > Or account['accountType'] == 'organization'
-                api_response_children = make_api_call('POST', '%s/_support/cloud/%s/%s/project' % (CONFIG['PRISMA_API_ENDPOINT'], account['cloudType'], account['accountId']), request_data)
+                api_response_children = make_api_call('POST', '%s/_support/cloud/%s/%s/project' % (CONFIG['PRISMA_API_ENDPOINT'], account['cloudType'], account['accountId']), body_params)
                 account_list.extend(parse_account_children(account, api_response_children))
             else:
                 account_list.append(account)
     else:
         api_response = make_api_call('GET', '%s/cloud' % CONFIG['PRISMA_API_ENDPOINT'])
-        api_response_json = json.loads(api_response)
+        api_response_json = json_loads(api_response)
         for account in api_response_json:
             if account['accountType'] == 'organization': # ? Or account['numberOfChildAccounts'] > 0
                 api_response_children = make_api_call('GET', '%s/cloud/%s/%s/project' % (CONFIG['PRISMA_API_ENDPOINT'], account['cloudType'], account['accountId']))
                 account_list.extend(parse_account_children(account, api_response_children))
             else:
                 account_list.append(account)
-    result_file = open(output_file_name, 'w', encoding='utf8')
-    result_file.write(json.dumps(account_list))
-    result_file.close()
+    Path(output_file_name).write_bytes(json_dumps(account_list))
 
 ##
 
 def parse_account_children(account, api_response_children):
     children = []
-    api_response_children_json = json.loads(api_response_children)
+    api_response_children_json = json_loads(api_response_children)
     for child_account in api_response_children_json:
         # Children of an organization include the parent, but numberOfChildAccounts is always reported as zero by the endpoint.
         if account['accountId'] == child_account['accountId']:
@@ -376,13 +447,10 @@ def get_account_groups(output_file_name):
     delete_file_if_exists(output_file_name)
     if CONFIG['SUPPORT_API_MODE']:
         body_params = {"customerName": "%s" % CONFIG['CUSTOMER_NAME']}
-        request_data = json.dumps(body_params)
-        api_response = make_api_call('POST', '%s/_support/cloud/group' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
+        api_response = make_api_call('POST', '%s/_support/cloud/group' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
     else:
         api_response = make_api_call('GET', '%s/cloud/group' % CONFIG['PRISMA_API_ENDPOINT'])
-    result_file = open(output_file_name, 'wb')
-    result_file.write(api_response)
-    result_file.close()
+    Path(output_file_name).write_bytes(api_response)
 
 ####
 
@@ -390,13 +458,10 @@ def get_alert_rules(output_file_name):
     delete_file_if_exists(output_file_name)
     if CONFIG['SUPPORT_API_MODE']:
         body_params = {"customerName": "%s" % CONFIG['CUSTOMER_NAME']}
-        request_data = json.dumps(body_params)
-        api_response = make_api_call('POST', '%s/_support/alert/rule' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
+        api_response = make_api_call('POST', '%s/_support/alert/rule' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
     else:
         api_response = make_api_call('GET', '%s/v2/alert/rule' % CONFIG['PRISMA_API_ENDPOINT'])
-    result_file = open(output_file_name, 'wb')
-    result_file.write(api_response)
-    result_file.close()
+    Path(output_file_name).write_bytes(api_response)
 
 ####
 
@@ -404,13 +469,10 @@ def get_integrations(output_file_name):
     delete_file_if_exists(output_file_name)
     if CONFIG['SUPPORT_API_MODE']:
         body_params = {"customerName": "%s" % CONFIG['CUSTOMER_NAME']}
-        request_data = json.dumps(body_params)
-        api_response = make_api_call('POST', '%s/_support/integration' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
+        api_response = make_api_call('POST', '%s/_support/integration' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
     else:
         api_response = make_api_call('GET', '%s/integration' % CONFIG['PRISMA_API_ENDPOINT'])
-    result_file = open(output_file_name, 'wb')
-    result_file.write(api_response)
-    result_file.close()
+    Path(output_file_name).write_bytes(api_response)
 
 #### WIP
 
@@ -432,17 +494,13 @@ def get_cloud_resources(output_file_name, cloud_accounts_list):
         }
         if CONFIG['SUPPORT_API_MODE']:
             body_params['customerName'] = CONFIG['CUSTOMER_NAME']
-            request_data = json.dumps(body_params)
-            # api_response = make_api_call('POST', '%s/_support/WIP' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
+            # api_response = make_api_call('POST', '%s/_support/WIP' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
             api_response = []
         else:
-            request_data = json.dumps(body_params)
-            api_response = make_api_call('POST', '%s/resource' % CONFIG['PRISMA_API_ENDPOINT'], request_data)
+            api_response = make_api_call('POST', '%s/resource' % CONFIG['PRISMA_API_ENDPOINT'], body_params)
         resource_list.append(api_response)
 
-    result_file = open(output_file_name, 'wb')
-    result_file.write(resource_list)
-    result_file.close()
+    Path(output_file_name).write_bytes(resource_list)
 
 ##########################################################################################
 # Collect mode: Query the API and write the results to files.
@@ -457,53 +515,59 @@ def collect_data():
         output()
     CONFIG['PRISMA_API_HEADERS']['x-redlock-auth'] = token
     output()
-    output('Querying Policies (please wait)')
-    get_policies(CONFIG['RESULTS_FILE']['POLICIES'])
-    output('Results saved as: %s' % CONFIG['RESULTS_FILE']['POLICIES'])
-    output()
-    output('Generating Prisma Cloud API Token')
-    token = get_prisma_login()
-    if CONFIG['DEBUG_MODE']:
-        output()
-        output(token)
-        output()
-    CONFIG['PRISMA_API_HEADERS']['x-redlock-auth'] = token
-    output('Querying Alerts: Time Range: %s (please wait)' % CONFIG['TIME_RANGE_LABEL'])
-    get_alerts(CONFIG['RESULTS_FILE']['ALERTS'])
-    output('Results saved as: %s' % CONFIG['RESULTS_FILE']['ALERTS'])
-    output()
-    output('Generating Prisma Cloud API Token')
-    token = get_prisma_login()
-    if CONFIG['DEBUG_MODE']:
-        output()
-        output(token)
+    # These queries are independent, so run them concurrently (each is bound by API latency, not CPU).
+    queries = [
+        ('Policies',                                            get_policies,       'POLICIES'),
+        ('Alerts: Time Range: %s' % CONFIG['TIME_RANGE_LABEL'], get_alerts,         'ALERTS'),
+        ('Assets: Time Range: %s' % CONFIG['TIME_RANGE_LABEL'], get_assets,         'ASSETS'),
+        ('Users',                                               get_users,          'USERS'),
+        ('Accounts',                                            get_accounts,       'ACCOUNTS'),
+        ('Account Groups',                                      get_account_groups, 'GROUPS'),
+        ('Alert Rules',                                         get_alert_rules,    'RULES'),
+        ('Integrations',                                        get_integrations,   'INTEGRATIONS'),
+    ]
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = {}
+        for query_label, query_function, result_file in queries:
+            output('Querying %s (please wait)' % query_label)
+            futures[executor.submit(cached_query, query_function, CONFIG['RESULTS_FILE'][result_file])] = result_file
         output()
-    CONFIG['PRISMA_API_HEADERS']['x-redlock-auth'] = token
-    output('Querying Assets: Time Range: %s' % CONFIG['TIME_RANGE_LABEL'])
-    get_assets(CONFIG['RESULTS_FILE']['ASSETS'])
-    output('Results saved as: %s' % CONFIG['RESULTS_FILE']['ASSETS'])
-    output()
-    output('Querying Users')
-    get_users(CONFIG['RESULTS_FILE']['USERS'])
-    output('Results saved as: %s' % CONFIG['RESULTS_FILE']['USERS'])
-    output()
-    output('Querying Accounts')
-    get_accounts(CONFIG['RESULTS_FILE']['ACCOUNTS'])
-    output('Results saved as: %s' % CONFIG['RESULTS_FILE']['ACCOUNTS'])
-    output()
-    output('Querying Account Groups')
-    get_account_groups(CONFIG['RESULTS_FILE']['GROUPS'])
-    output('Results saved as: %s' % CONFIG['RESULTS_FILE']['GROUPS'])
-    output()
-    output('Querying Alert Rules')
-    get_alert_rules(CONFIG['RESULTS_FILE']['RULES'])
-    output('Results saved as: %s' % CONFIG['RESULTS_FILE']['RULES'])
-    output()
-    output('Querying Integrations')
-    get_integrations(CONFIG['RESULTS_FILE']['INTEGRATIONS'])
-    output('Results saved as: %s' % CONFIG['RESULTS_FILE']['INTEGRATIONS'])
+        for future in as_completed(futures):
+            future.result()
+            output('Results saved as: %s' % CONFIG['RESULTS_FILE'][futures[future]])
     output()
 
+# Re-use the result of an identical query (same query, Access Key, tenant, customer, and parameters) saved within CONFIG['CACHE_EXPIRE'].
+
+def cached_query(query_function, output_file_name):
+    if CACHE is None:
+        query_function(output_file_name)
+        return
+    # Results depend upon the role of the Access Key, so include (a hash of, never the raw) Access Key.
+    cache_key_params = [
+        query_function.__name__,
+        hashlib.sha256(CONFIG['PRISMA_ACCESS_KEY'].encode('utf-8')).hexdigest(),
+        CONFIG['PRISMA_API_ENDPOINT'],
+        CONFIG['CUSTOMER_PREFIX'],
+        CONFIG['CLOUD_ACCOUNT_ID'],
+        CONFIG['TIME_RANGE_AMOUNT'],
+        CONFIG['TIME_RANGE_UNIT'],
+        CONFIG['SUPPORT_API_MODE']
+    ]
+    cache_key = hashlib.sha1(json.dumps(cache_key_params).encode('utf-8')).hexdigest()
+    # Copy results to and from the cache as files, so (large) results are not read into memory.
+    if CONFIG['USE_CACHE']:
+        cached_response = CACHE.get(cache_key, read=True)
+        if cached_response is not None:
+            debug_output('Using cached result for: %s', query_function.__name__)
+            with cached_response, open(output_file_name, 'wb') as output_file:
+                copyfileobj(cached_response, output_file)
+            return
+    query_function(output_file_name)
+    if os.path.isfile(output_file_name):
+        with open(output_file_name, 'rb') as output_file:
+            CACHE.set(cache_key, output_file, read=True, expire=CONFIG['CACHE_EXPIRE'])
+
 ##########################################################################################
 # Collect mode: Pretty the input files ... using jq to avoid encoding errors.
 ##########################################################################################
@@ -532,47 +596,92 @@ def read_collected_data():
         if not os.path.isfile(this_file):
             output('Error: Query result file does not exist: %s' % this_file)
             sys.exit(1)
-        with open(this_file, 'r', encoding='utf8') as json_file:
-            DATA[this_result_file] = json.load(json_file)
+        if this_result_file == 'ALERTS' and ijson and json_file_is_list(this_file):
+            # Stream the list of Alerts in process_collected_data() instead of loading it here.
+            DATA['ALERTS_PATH'] = this_file
+            continue
+        if this_result_file == 'ALERTS':
+            DATA[this_result_file] = read_alerts(Path(this_file).read_bytes())
+        else:
+            DATA[this_result_file] = json_loads(Path(this_file).read_bytes())
+
+def json_file_is_list(file_name):
+    with open(file_name, 'rb') as json_file:
+        return json_file.read(1024).lstrip()[:1] == b'['
+
+# The Alerts file can be hundreds of MB, but only a handful of keys of each Alert are read.
+# With ijson, Alerts are parsed and processed one at a time, so the list is never held in memory.
+# Without ijson, but with pysimdjson, fields are decoded on access instead of materializing every Alert as a dictionary.
+# A parser holds one document at a time, so the Alerts file gets a dedicated parser.
+# SUPPORT_API_MODE saves a (small) dictionary, which is materialized for the isinstance() test in process_collected_data().
+
+def read_alerts(json_data):
+    if simdjson is None:
+        return json_loads(json_data)
+    alerts = ALERTS_PARSER.parse(json_data)
+    if isinstance(alerts, simdjson.Object):
+        return alerts.as_dict()
+    return alerts
 
 ##########################################################################################
 # Process mode: Process the data.
 ##########################################################################################
 
+CLOUD_TYPES       = ('all', 'aws', 'azure', 'gcp', 'alibaba_cloud', 'oci')
+POLICY_MODES      = ('default', 'custom')
+POLICY_SEVERITIES = ('critical', 'high', 'medium', 'low', 'informational')
+POLICY_TYPES      = ('anomaly', 'audit_event', 'config', 'data', 'iam', 'network', 'workload_incident', 'workload_vulnerability', 'attack_path')
+POLICY_STATES     = ('disabled', 'deleted')
+POLICY_FEATURES   = ('shiftable', 'remediable', 'shiftable_and_remediable')
+RESOURCE_STATES   = ('updated', 'deleted')
+ALERT_STATUSES    = ('open', 'dismissed', 'snoozed', 'resolved')
+
+# Each of these returns a new dictionary of counters.
+
 def cloud_types():
-    return dict({'all': 0, 'aws': 0, 'azure': 0, 'gcp': 0, 'alibaba_cloud': 0, 'oci': 0})
+    return dict.fromkeys(CLOUD_TYPES, 0)
 
 def policy_modes():
-    return dict({'default': 0, 'custom': 0})
+    return dict.fromkeys(POLICY_MODES, 0)
 
 def policy_severities():
-    return dict({'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'informational': 0})
+    return dict.fromkeys(POLICY_SEVERITIES, 0)
 
 def policy_types():
-    return dict({'anomaly': 0, 'audit_event': 0, 'config': 0, 'data': 0, 'iam': 0, 'network': 0, 'workload_incident': 0, 'workload_vulnerability': 0, 'attack_path': 0})
+    return dict.fromkeys(POLICY_TYPES, 0)
 
 def policy_states():
-    return dict({'disabled': 0, 'deleted': 0})
+    return dict.fromkeys(POLICY_STATES, 0)
 
 def policy_features():
-    return dict({'shiftable': 0, 'remediable': 0, 'shiftable_and_remediable': 0})
+    return dict.fromkeys(POLICY_FEATURES, 0)
 
 def resource_states():
-    return dict({'updated': 0, 'deleted': 0})
+    return dict.fromkeys(RESOURCE_STATES, 0)
 
 def alert_statuses():
-    return dict({'open': 0, 'dismissed': 0, 'snoozed': 0, 'resolved': 0})
+    return dict.fromkeys(ALERT_STATUSES, 0)
 
 ##
 
 def process_collected_data():
     # SUPPORT_API_MODE saves a dictionary (of Open) Alerts instead of a list.
     # Use that to override any '--support_api' argument.
-    if isinstance(DATA['ALERTS'], dict):
+    if isinstance(DATA.get('ALERTS'), dict):
         CONFIG['SUPPORT_API_MODE'] = True
         RESULTS['alerts_aggregated_by'] = process_aggregated_alerts(DATA['ALERTS'])
+    # SUMMARY (counted while processing Policies and Alerts, and in process_summary)
+    RESULTS['summary'] = {}
+    RESULTS['summary']['count_of_assets'] = 0
+    RESULTS['summary']['count_of_aggregated_open_alerts'] = 0
+    RESULTS['summary']['count_of_resources_with_alerts_from_alerts'] = 0
+    RESULTS['summary']['count_of_compliance_standards_with_alerts_from_policies'] = 0
+    RESULTS['summary']['count_of_compliance_standards_with_alerts_from_alerts']   = 0
+    RESULTS['summary']['count_of_policies_with_alerts_from_policies']             = 0
+    RESULTS['summary']['count_of_policies_with_alerts_from_policies_by_cloud']    = cloud_types()
+    RESULTS['summary']['count_of_policies_with_alerts_from_alerts']               = 0
     # POLICIES
-    RESULTS['compliance_standards_from_policies'] = {}
+    RESULTS['compliance_standards_from_policies'] = defaultdict(policy_severities)
     RESULTS['policies_by_name'] = {}
     RESULTS['policies'] = {}
     RESULTS['alert_counts_from_policies'] = {
@@ -585,7 +694,7 @@ def process_collected_data():
     }
     process_policies(DATA['POLICIES'])
     # ALERTS
-    RESULTS['compliance_standards_from_alerts'] = {}
+    RESULTS['compliance_standards_from_alerts'] = defaultdict(policy_severities)
     RESULTS['policies_from_alerts'] = {}
     RESULTS['policy_counts_from_alerts'] = {
         'cloud_type': cloud_types(),
@@ -612,20 +721,15 @@ def process_collected_data():
         'resolved_by_policy':   policy_states(),
         'resolved_by_resource': resource_states(),
     }
-    RESULTS['deleted_policies_from_alerts']  = {}
-    RESULTS['disabled_policies_from_alerts'] = {}
+    RESULTS['deleted_policies_from_alerts']  = defaultdict(int)
+    RESULTS['disabled_policies_from_alerts'] = defaultdict(int)
     RESULTS['resources_from_alerts'] = {}
-    process_alerts(DATA['ALERTS'])
-    # SUMMARY
-    RESULTS['summary'] = {}
-    RESULTS['summary']['count_of_assets'] = 0
-    RESULTS['summary']['count_of_aggregated_open_alerts'] = 0
-    RESULTS['summary']['count_of_resources_with_alerts_from_alerts'] = 0
-    RESULTS['summary']['count_of_compliance_standards_with_alerts_from_policies'] = 0
-    RESULTS['summary']['count_of_compliance_standards_with_alerts_from_alerts']   = 0
-    RESULTS['summary']['count_of_policies_with_alerts_from_policies']             = 0
-    RESULTS['summary']['count_of_policies_with_alerts_from_policies_by_cloud']    = cloud_types()
-    RESULTS['summary']['count_of_policies_with_alerts_from_alerts']               = 0
+    RESULTS['count_of_alerts_from_alerts'] = 0
+    if 'ALERTS_PATH' in DATA:
+        with open(DATA['ALERTS_PATH'], 'rb') as json_file:
+            process_alerts(ijson.items(json_file, 'item', use_float=True))
+    else:
+        process_alerts(DATA['ALERTS'])
     process_summary()
 
 ##########################################################################################
@@ -658,62 +762,87 @@ def process_aggregated_alerts(alerts):
 ##########################################################################################
 
 def process_policies(policies):
+    # Bind frequently used dictionaries to locals.
+    policies_by_name   = RESULTS['policies_by_name']
+    policies_by_id     = RESULTS['policies']
+    support_api_mode   = CONFIG['SUPPORT_API_MODE']
+    if support_api_mode:
+        aggregated_alert_counts = RESULTS['alerts_aggregated_by']['policy']
+    # Count Policies with Alerts as they are added, instead of in another pass over the Policies.
+    policies_with_alerts_by_cloud = Counter()
     for this_policy in policies:
         this_policy_id = this_policy['policyId']
-        RESULTS['policies_by_name'][this_policy['name']] = {'policyId': this_policy_id}
-        RESULTS['policies'][this_policy_id] = {'policyName': this_policy['name']}
-        RESULTS['policies'][this_policy_id]['policyEnabled']       = this_policy['enabled']
-        RESULTS['policies'][this_policy_id]['policySeverity']      = this_policy['severity']
-        RESULTS['policies'][this_policy_id]['policyType']          = this_policy['policyType']
-        RESULTS['policies'][this_policy_id]['policySubTypes']      = this_policy['policySubTypes']
-        RESULTS['policies'][this_policy_id]['policyCategory']      = this_policy['policyCategory']
-        RESULTS['policies'][this_policy_id]['policyClass']         = this_policy['policyClass']
-        RESULTS['policies'][this_policy_id]['policyCloudType']     = this_policy['cloudType'].lower()
-        RESULTS['policies'][this_policy_id]['policyShiftable']     = 'build' in this_policy['policySubTypes']
-        RESULTS['policies'][this_policy_id]['policyRemediable']    = this_policy['remediable']
-        #
-        RESULTS['policies'][this_policy_id]['policyShiftableRemediable'] = 'build' in this_policy['policySubTypes'] and this_policy['remediable']
-        #
-        RESULTS['policies'][this_policy_id]['policySystemDefault'] = this_policy['systemDefault']
-        RESULTS['policies'][this_policy_id]['policyLabels']        = this_policy['labels']
-        if 'policyUpi' in this_policy:
-            RESULTS['policies'][this_policy_id]['policyUpi'] = this_policy['policyUpi']
-        else:
-            RESULTS['policies'][this_policy_id]['policyUpi'] = 'UNKNOWN'
+        policy_name    = this_policy['name']
         # Alerts
-        if CONFIG['SUPPORT_API_MODE']:
-            if this_policy['name'] in RESULTS['alerts_aggregated_by']['policy']:
-                RESULTS['policies'][this_policy_id]['alertCount'] = RESULTS['alerts_aggregated_by']['policy'][this_policy['name']]
-            else:
-                RESULTS['policies'][this_policy_id]['alertCount'] = 0
-        else:
-            RESULTS['policies'][this_policy_id]['alertCount']     = this_policy['openAlertsCount']
-        RESULTS['alert_counts_from_policies']['status']['open']                               += RESULTS['policies'][this_policy_id]['alertCount']
-        RESULTS['alert_counts_from_policies']['severity'][this_policy['severity']]            += RESULTS['policies'][this_policy_id]['alertCount']
-        RESULTS['alert_counts_from_policies']['type'][this_policy['policyType']]              += RESULTS['policies'][this_policy_id]['alertCount']
-        RESULTS['alert_counts_from_policies']['cloud_type'][this_policy['cloudType'].lower()] += RESULTS['policies'][this_policy_id]['alertCount']
-        if RESULTS['policies'][this_policy_id]['policyRemediable']:
-            RESULTS['alert_counts_from_policies']['feature']['remediable']         += RESULTS['policies'][this_policy_id]['alertCount']
-        if RESULTS['policies'][this_policy_id]['policyShiftable']:
-            RESULTS['alert_counts_from_policies']['feature']['shiftable']          += RESULTS['policies'][this_policy_id]['alertCount']
-        if RESULTS['policies'][this_policy_id]['policyShiftableRemediable']:
-            RESULTS['alert_counts_from_policies']['feature']['shiftable_and_remediable'] += RESULTS['policies'][this_policy_id]['alertCount']
-        if RESULTS['policies'][this_policy_id]['policySystemDefault'] == True:
-            RESULTS['alert_counts_from_policies']['mode']['default']               += RESULTS['policies'][this_policy_id]['alertCount']
+        if support_api_mode:
+            alert_count = aggregated_alert_counts.get(policy_name, 0)
         else:
-            RESULTS['alert_counts_from_policies']['mode']['custom']                += RESULTS['policies'][this_policy_id]['alertCount']
-        # Create sets and lists of Compliance Standards to create a sorted, unique list of counters for each Compliance Standard.
-        RESULTS['policies'][this_policy_id]['complianceStandards'] = []
-        if 'complianceMetadata' in this_policy:
-            compliance_standards_set = set()
-            for standard in this_policy['complianceMetadata']:
-                compliance_standards_set.add(standard['standardName'])
-            compliance_standards_list = list(compliance_standards_set)
-            compliance_standards_list.sort()
-            RESULTS['policies'][this_policy_id]['complianceStandards'] = compliance_standards_list
-            for compliance_standard_name in compliance_standards_list:
-                RESULTS['compliance_standards_from_policies'].setdefault(compliance_standard_name, policy_severities())
-                RESULTS['compliance_standards_from_policies'][compliance_standard_name][this_policy['severity']] += RESULTS['policies'][this_policy_id]['alertCount']
+            alert_count = this_policy['openAlertsCount']
+        policy_severity = this_policy['severity']
+        policy_shiftable = 'build' in this_policy['policySubTypes']
+        policy_cloud_type = this_policy['cloudType'].lower()
+        if alert_count:
+            policies_with_alerts_by_cloud[policy_cloud_type] += 1
+        policies_by_name[policy_name] = {'policyId': this_policy_id}
+        this_policy_details = {
+            'policyName':                policy_name,
+            'policyEnabled':             this_policy['enabled'],
+            'policySeverity':            policy_severity,
+            'policyType':                this_policy['policyType'],
+            'policySubTypes':            this_policy['policySubTypes'],
+            'policyCategory':            this_policy['policyCategory'],
+            'policyClass':               this_policy['policyClass'],
+            'policyCloudType':           policy_cloud_type,
+            'policyShiftable':           policy_shiftable,
+            'policyRemediable':          this_policy['remediable'],
+            'policyShiftableRemediable': policy_shiftable and this_policy['remediable'],
+            'policySystemDefault':       this_policy['systemDefault'],
+            'policyLabels':              this_policy['labels'],
+            'policyUpi':                 this_policy.get('policyUpi', 'UNKNOWN'),
+            'alertCount':                alert_count,
+        }
+        policies_by_id[this_policy_id] = this_policy_details
+        # Create a sorted, unique list of Compliance Standards.
+        this_policy_details['complianceStandards'] = sorted({standard['standardName'] for standard in this_policy.get('complianceMetadata', ())})
+    RESULTS['summary']['count_of_policies_with_alerts_from_policies'] = sum(policies_with_alerts_by_cloud.values())
+    policies_with_alerts_from_policies_by_cloud = RESULTS['summary']['count_of_policies_with_alerts_from_policies_by_cloud']
+    for cloud_type in policies_with_alerts_from_policies_by_cloud:
+        policies_with_alerts_from_policies_by_cloud[cloud_type] = policies_with_alerts_by_cloud[cloud_type]
+    # A columnar copy of the Policies, indexed by Policy ID, shared by the pandas aggregations and worksheets.
+    RESULTS['policy_frame'] = pd.DataFrame.from_dict(policies_by_id, orient='index')
+    count_alerts_from_policies()
+
+# Sum Alert counts by Policy attributes with (vectorized) pandas aggregations instead of per-Policy increments.
+
+def count_alerts_from_policies():
+    if not RESULTS['policies']:
+        return
+    policy_frame = RESULTS['policy_frame']
+    alert_counts = policy_frame['alertCount']
+    counts = RESULTS['alert_counts_from_policies']
+    counts['status']['open']                      += int(alert_counts.sum())
+    add_counts(counts['severity'],   alert_counts.groupby(policy_frame['policySeverity']).sum())
+    add_counts(counts['type'],       alert_counts.groupby(policy_frame['policyType']).sum())
+    add_counts(counts['cloud_type'], alert_counts.groupby(policy_frame['policyCloudType']).sum())
+    counts['feature']['remediable']               += int(alert_counts[policy_frame['policyRemediable'].astype(bool)].sum())
+    counts['feature']['shiftable']                += int(alert_counts[policy_frame['policyShiftable'].astype(bool)].sum())
+    counts['feature']['shiftable_and_remediable'] += int(alert_counts[policy_frame['policyShiftableRemediable'].astype(bool)].sum())
+    is_default = policy_frame['policySystemDefault'].eq(True)
+    counts['mode']['default']                     += int(alert_counts[is_default].sum())
+    counts['mode']['custom']                      += int(alert_counts[~is_default].sum())
+    add_standards_counts(RESULTS['compliance_standards_from_policies'], policy_frame)
+
+def add_counts(counts, totals):
+    for key, total in totals.items():
+        counts[key] += int(total)
+
+# Sum Alert counts by Compliance Standard and Policy Severity, with one row per Compliance Standard of each Policy.
+
+def add_standards_counts(standards_counts, frame):
+    standards_frame = frame[['complianceStandards', 'policySeverity', 'alertCount']].explode('complianceStandards')
+    totals = standards_frame.groupby(['complianceStandards', 'policySeverity'], sort=False)['alertCount'].sum()
+    for (compliance_standard_name, policy_severity), total in totals.items():
+        standards_counts[compliance_standard_name][policy_severity] += int(total)
 
 ##########################################################################################
 # Loop through all Alerts and collect the details of each Alert.
@@ -723,78 +852,94 @@ def process_policies(policies):
 # SUPPORT_API_MODE: Substitute aggregated Alerts (as '/_support/policy' does not return openAlertsCount).
 ##########################################################################################
 
+# SUPPORT_API_MODE: Counters copied from the aggregated Alerts, with the keys copied from each.
+
+AGGREGATED_POLICY_COUNTS = {
+    'severity': POLICY_SEVERITIES,
+    'type':     ('anomaly', 'audit_event', 'config', 'data', 'iam', 'network', 'workload_incident', 'workload_vulnerability'),
+}
+AGGREGATED_ALERT_COUNTS = {
+    'status':   ('open', 'resolved'),
+}
+
 def process_alerts(alerts):
     if CONFIG['SUPPORT_API_MODE']:
-        RESULTS['policy_counts_from_alerts']['severity']['critical']           = RESULTS['alerts_aggregated_by']['severity']['critical']
-        RESULTS['policy_counts_from_alerts']['severity']['high']               = RESULTS['alerts_aggregated_by']['severity']['high']
-        RESULTS['policy_counts_from_alerts']['severity']['medium']             = RESULTS['alerts_aggregated_by']['severity']['medium']
-        RESULTS['policy_counts_from_alerts']['severity']['low']                = RESULTS['alerts_aggregated_by']['severity']['low']
-        RESULTS['policy_counts_from_alerts']['severity']['informational']      = RESULTS['alerts_aggregated_by']['severity']['informational']
-        RESULTS['policy_counts_from_alerts']['type']['anomaly']                = RESULTS['alerts_aggregated_by']['type']['anomaly']
-        RESULTS['policy_counts_from_alerts']['type']['audit_event']            = RESULTS['alerts_aggregated_by']['type']['audit_event']
-        RESULTS['policy_counts_from_alerts']['type']['config']                 = RESULTS['alerts_aggregated_by']['type']['config']
-        RESULTS['policy_counts_from_alerts']['type']['data']                   = RESULTS['alerts_aggregated_by']['type']['data']
-        RESULTS['policy_counts_from_alerts']['type']['iam']                    = RESULTS['alerts_aggregated_by']['type']['iam']
-        RESULTS['policy_counts_from_alerts']['type']['network']                = RESULTS['alerts_aggregated_by']['type']['network']
-        RESULTS['policy_counts_from_alerts']['type']['workload_incident']      = RESULTS['alerts_aggregated_by']['type']['workload_incident']
-        RESULTS['policy_counts_from_alerts']['type']['workload_vulnerability'] = RESULTS['alerts_aggregated_by']['type']['workload_vulnerability']
-        RESULTS['alert_counts_from_alerts']['status']['open']                  = RESULTS['alerts_aggregated_by']['status']['open']
-        RESULTS['alert_counts_from_alerts']['status']['resolved']              = RESULTS['alerts_aggregated_by']['status']['resolved']
+        alerts_aggregated_by = RESULTS['alerts_aggregated_by']
+        for counter_name, keys in AGGREGATED_POLICY_COUNTS.items():
+            RESULTS['policy_counts_from_alerts'][counter_name].update({key: alerts_aggregated_by[counter_name][key] for key in keys})
+        for counter_name, keys in AGGREGATED_ALERT_COUNTS.items():
+            RESULTS['alert_counts_from_alerts'][counter_name].update({key: alerts_aggregated_by[counter_name][key] for key in keys})
     else:
+        # Tally the Alerts by the attributes that are counted (a histogram of Alerts) in one pass,
+        # then count each distinct combination of attributes once, weighted by its number of Alerts.
+        alert_tally = Counter()
+        resources_from_alerts = RESULTS['resources_from_alerts']
         for this_alert in alerts:
-            this_policy_id = this_alert['policy']['policyId']
-            if this_alert['policy']['systemDefault'] == True:
-                RESULTS['alert_counts_from_alerts']['mode']['default'] += 1
-            else:
-                RESULTS['alert_counts_from_alerts']['mode']['custom']  += 1
-            RESULTS['alert_counts_from_alerts']['type'][this_alert['policy']['policyType']] += 1
-            if this_alert['policy']['remediable']:
-                RESULTS['alert_counts_from_alerts']['feature']['remediable'] += 1
-                RESULTS['alert_counts_from_alerts']['status_by_feature']['remediable'][this_alert['status']] += 1
-            RESULTS['alert_counts_from_alerts']['status'][this_alert['status']] += 1
-            if 'reason' in this_alert:
-                if this_alert['reason'] == 'RESOURCE_DELETED':
-                    RESULTS['alert_counts_from_alerts']['resolved_by_resource']['deleted'] += 1
-                if this_alert['reason'] == 'RESOURCE_UPDATED':
-                    RESULTS['alert_counts_from_alerts']['resolved_by_resource']['updated'] += 1
-            if 'resource' in this_alert:
-                if 'rrn' in this_alert['resource']:
-                    RESULTS['resources_from_alerts'][this_alert['resource']['rrn']] = this_alert['resource']['rrn']
-            #
-            # This is all of the data we can collect without a reference to a Policy.
-            #
-            if not this_policy_id in RESULTS['policies']:
-                if 'reason' in this_alert:
-                    if this_alert['reason'] == 'POLICY_DELETED':
-                        RESULTS['deleted_policies_from_alerts'].setdefault(this_policy_id, 0)
-                        RESULTS['deleted_policies_from_alerts'][this_policy_id] += 1
-                        RESULTS['alert_counts_from_alerts']['resolved_by_policy']['deleted'] += 1
-                if CONFIG['DEBUG_MODE']:
-                    output('Skipping Alert: Related Policy Not Found: Policy ID: %s' % this_policy_id)
-                continue
-            # Policy data from the related Policy.
-            policy_name = RESULTS['policies'][this_policy_id]['policyName']
-            RESULTS['policies_from_alerts'].setdefault(policy_name, {'policyId': this_policy_id, 'alertCount': 0})
-            RESULTS['policies_from_alerts'][policy_name]['alertCount'] += 1
-            RESULTS['policy_counts_from_alerts']['severity'][RESULTS['policies'][this_policy_id]['policySeverity']] += 1
-            RESULTS['policy_counts_from_alerts']['type'][RESULTS['policies'][this_policy_id]['policyType']] += 1
-            if RESULTS['policies'][this_policy_id]['policyEnabled'] == False:
-                RESULTS['disabled_policies_from_alerts'].setdefault(policy_name, 0)
-                RESULTS['disabled_policies_from_alerts'][policy_name] += 1
-                RESULTS['alert_counts_from_alerts']['policy']['disabled'] += 1
-            # Compliance Standard data from the related Policy.
-            for compliance_standard_name in RESULTS['policies'][this_policy_id]['complianceStandards']:
-                RESULTS['compliance_standards_from_alerts'].setdefault(compliance_standard_name, policy_severities())
-                RESULTS['compliance_standards_from_alerts'][compliance_standard_name][RESULTS['policies'][this_policy_id]['policySeverity']] += 1
-            # Alert data from the related Policy.
-            RESULTS['alert_counts_from_alerts']['cloud_type'][RESULTS['policies'][this_policy_id]['policyCloudType']] += 1
-            if RESULTS['policies'][this_policy_id]['policyShiftable']:
-                RESULTS['alert_counts_from_alerts']['feature']['shiftable'] += 1
-            if RESULTS['policies'][this_policy_id]['policyRemediable']:
-                RESULTS['alert_counts_from_alerts']['feature']['remediable'] += 1
-            if RESULTS['policies'][this_policy_id]['policyShiftableRemediable']:
-                RESULTS['alert_counts_from_alerts']['feature']['shiftable_and_remediable'] += 1
-            RESULTS['alert_counts_from_alerts']['severity_by_status'][this_alert['status']][RESULTS['policies'][this_policy_id]['policySeverity']] += 1
+            alert_policy = this_alert['policy']
+            alert_tally[(alert_policy['policyId'], this_alert['status'], this_alert.get('reason'), alert_policy['systemDefault'], alert_policy['policyType'], alert_policy['remediable'])] += 1
+            alert_resource = this_alert.get('resource')
+            if alert_resource and 'rrn' in alert_resource:
+                resource_rrn = alert_resource['rrn']
+                resources_from_alerts[resource_rrn] = resource_rrn
+        RESULTS['count_of_alerts_from_alerts'] += sum(alert_tally.values())
+        count_alerts_from_alerts(alert_tally)
+
+# Sum the tallied Alert counts by Alert and Policy attributes with (vectorized) pandas aggregations.
+
+POLICY_COLUMNS_FOR_ALERTS = ('policyName', 'policyEnabled', 'policySeverity', 'policyType', 'policyCloudType', 'policyShiftable', 'policyRemediable', 'policyShiftableRemediable', 'complianceStandards')
+
+def count_alerts_from_alerts(alert_tally):
+    if not alert_tally:
+        return
+    counts = RESULTS['alert_counts_from_alerts']
+    policy_counts = RESULTS['policy_counts_from_alerts']
+    alert_frame = pd.DataFrame(list(alert_tally), columns=['policyId', 'status', 'reason', 'systemDefault', 'policyType', 'remediable'])
+    alert_frame['alertCount'] = list(alert_tally.values())
+    alert_counts = alert_frame['alertCount']
+    is_default    = alert_frame['systemDefault'].eq(True)
+    is_remediable = alert_frame['remediable'].astype(bool)
+    counts['mode']['default']                 += int(alert_counts[is_default].sum())
+    counts['mode']['custom']                  += int(alert_counts[~is_default].sum())
+    add_counts(counts['type'],   alert_counts.groupby(alert_frame['policyType']).sum())
+    counts['feature']['remediable']           += int(alert_counts[is_remediable].sum())
+    add_counts(counts['status_by_feature']['remediable'], alert_counts[is_remediable].groupby(alert_frame['status']).sum())
+    add_counts(counts['status'], alert_counts.groupby(alert_frame['status']).sum())
+    counts['resolved_by_resource']['deleted'] += int(alert_counts[alert_frame['reason'].eq('RESOURCE_DELETED')].sum())
+    counts['resolved_by_resource']['updated'] += int(alert_counts[alert_frame['reason'].eq('RESOURCE_UPDATED')].sum())
+    #
+    # This is all of the data we can collect without a reference to a Policy.
+    #
+    has_policy = alert_frame['policyId'].isin(RESULTS['policies'])
+    deleted_frame = alert_frame[~has_policy]
+    deleted_alert_counts = deleted_frame['alertCount'][deleted_frame['reason'].eq('POLICY_DELETED')]
+    add_counts(RESULTS['deleted_policies_from_alerts'], deleted_alert_counts.groupby(deleted_frame['policyId'], sort=False).sum())
+    counts['resolved_by_policy']['deleted']   += int(deleted_alert_counts.sum())
+    if CONFIG['DEBUG_MODE']:
+        for this_policy_id, alert_count in zip(deleted_frame['policyId'], deleted_frame['alertCount']):
+            output('Skipping %s Alert(s): Related Policy Not Found: Policy ID: %s' % (alert_count, this_policy_id))
+    # Policy data from the related Policy.
+    if not has_policy.any():
+        return
+    alert_frame = alert_frame[has_policy].drop(columns='policyType').join(RESULTS['policy_frame'][list(POLICY_COLUMNS_FOR_ALERTS)], on='policyId')
+    alert_counts = alert_frame['alertCount']
+    policies_from_alerts_setdefault = RESULTS['policies_from_alerts'].setdefault
+    by_policy_name = alert_frame.groupby('policyName', sort=False).agg(policyId=('policyId', 'first'), alertCount=('alertCount', 'sum'))
+    for policy_name, this_policy_id, alert_count in zip(by_policy_name.index, by_policy_name['policyId'], by_policy_name['alertCount']):
+        policies_from_alerts_setdefault(policy_name, {'policyId': this_policy_id, 'alertCount': 0})['alertCount'] += int(alert_count)
+    add_counts(policy_counts['severity'], alert_counts.groupby(alert_frame['policySeverity']).sum())
+    add_counts(policy_counts['type'],     alert_counts.groupby(alert_frame['policyType']).sum())
+    is_disabled = alert_frame['policyEnabled'].eq(False)
+    add_counts(RESULTS['disabled_policies_from_alerts'], alert_counts[is_disabled].groupby(alert_frame['policyName'], sort=False).sum())
+    counts['policy']['disabled']              += int(alert_counts[is_disabled].sum())
+    # Compliance Standard data from the related Policy.
+    add_standards_counts(RESULTS['compliance_standards_from_alerts'], alert_frame)
+    # Alert data from the related Policy.
+    add_counts(counts['cloud_type'], alert_counts.groupby(alert_frame['policyCloudType']).sum())
+    counts['feature']['shiftable']                += int(alert_counts[alert_frame['policyShiftable'].astype(bool)].sum())
+    counts['feature']['remediable']               += int(alert_counts[alert_frame['policyRemediable'].astype(bool)].sum())
+    counts['feature']['shiftable_and_remediable'] += int(alert_counts[alert_frame['policyShiftableRemediable'].astype(bool)].sum())
+    for (alert_status, policy_severity), alert_count in alert_counts.groupby([alert_frame['status'], alert_frame['policySeverity']]).sum().items():
+        counts['severity_by_status'][alert_status][policy_severity] += int(alert_count)
 
 ##########################################################################################
 # Process mode: Summarize the data.
@@ -807,174 +952,161 @@ def process_summary():
         RESULTS['summary']['count_of_aggregated_open_alerts']                     = RESULTS['alerts_aggregated_by']['status']['open']
     else:
         RESULTS['summary']['count_of_resources_with_alerts_from_alerts']          = len(RESULTS['resources_from_alerts'].keys())
-        RESULTS['summary']['count_of_policies_with_alerts_from_policies']         = sum(v['alertCount'] != 0 for k,v in RESULTS['policies'].items())
-        RESULTS['summary']['count_of_open_closed_alerts']                         = len(DATA['ALERTS'])
-    RESULTS['summary']['count_of_compliance_standards_with_alerts_from_policies'] = sum(v != policy_severities() for k,v in RESULTS['compliance_standards_from_policies'].items())
+        RESULTS['summary']['count_of_open_closed_alerts']                         = RESULTS['count_of_alerts_from_alerts']
+    RESULTS['summary']['count_of_compliance_standards_with_alerts_from_policies'] = sum(1 for v in RESULTS['compliance_standards_from_policies'].values() if any(v.values()))
     RESULTS['summary']['count_of_compliance_standards_with_alerts_from_alerts']   = len(RESULTS['compliance_standards_from_alerts'])
     RESULTS['summary']['count_of_policies_with_alerts_from_alerts']               = len(RESULTS['policies_from_alerts'])
-    #
-    RESULTS['summary']['count_of_policies_with_alerts_from_policies_by_cloud']['aws']           = sum(v['alertCount'] != 0 and v['policyCloudType'].lower() == 'aws'     for k,v in RESULTS['policies'].items())
-    RESULTS['summary']['count_of_policies_with_alerts_from_policies_by_cloud']['azure']         = sum(v['alertCount'] != 0 and v['policyCloudType'].lower() == 'azure'   for k,v in RESULTS['policies'].items())
-    RESULTS['summary']['count_of_policies_with_alerts_from_policies_by_cloud']['gcp']           = sum(v['alertCount'] != 0 and v['policyCloudType'].lower() == 'gcp'     for k,v in RESULTS['policies'].items())
-    RESULTS['summary']['count_of_policies_with_alerts_from_policies_by_cloud']['alibaba_cloud'] = sum(v['alertCount'] != 0 and v['policyCloudType'].lower() == 'alibaba_cloud' for k,v in RESULTS['policies'].items())
-    RESULTS['summary']['count_of_policies_with_alerts_from_policies_by_cloud']['oci']           = sum(v['alertCount'] != 0 and v['policyCloudType'].lower() == 'oci'     for k,v in RESULTS['policies'].items())
-    RESULTS['summary']['count_of_policies_with_alerts_from_policies_by_cloud']['all']           = sum(v['alertCount'] != 0 and v['policyCloudType'].lower() == 'all'     for k,v in RESULTS['policies'].items())
 
 ##########################################################################################
 # Process mode: Output the data.
 ##########################################################################################
 
 def output_collected_data():
-    panda_writer = open_sheet(CONFIG['OUTPUT_FILE_XLS'])
-    output_utilization(panda_writer)
-    output_alerts_by_compliance_standard(panda_writer)
-    output_alerts_by_policy(panda_writer)
-    output_alerts_summary(panda_writer)
-    save_sheet(panda_writer)
-    output('Results saved as: %s' % CONFIG['OUTPUT_FILE_XLS'])
+    workbook = open_sheet(CONFIG['OUTPUT_FILE_XLSX'])
+    output_utilization(workbook)
+    output_alerts_by_compliance_standard(workbook)
+    output_alerts_by_policy(workbook)
+    output_alerts_summary(workbook)
+    save_sheet(workbook)
+    output('Results saved as: %s' % CONFIG['OUTPUT_FILE_XLSX'])
 
 ##
 
+UPI_GROUP_PATTERN = re.compile(r'^(.*?)\-(\d+)$')
+
 def upi_group(policy_upi = ''):
-    # pylint: disable=anomalous-backslash-in-string
-    upi_search = re.search('^(.*?)\-(\d+)$', policy_upi)
+    upi_search = UPI_GROUP_PATTERN.search(policy_upi)
     if upi_search:
         return upi_search.group(1)
     return policy_upi
 
 ##
 
-def output_utilization(panda_writer):
+# Count the values of a key in a list of dictionaries, in one pass.
+
+def tally(items, key='enabled'):
+    return Counter(item.get(key) for item in items)
+
+def output_utilization(workbook):
     output('Saving Utilization Worksheet')
     output()
+    accounts_enabled     = tally(DATA['ACCOUNTS'])
+    accounts_cloud_types = Counter(account.get('cloudType').lower() for account in DATA['ACCOUNTS'])
+    rules_enabled        = tally(DATA['RULES'])
+    integrations_enabled = tally(DATA['INTEGRATIONS'])
+    policies_enabled     = tally(DATA['POLICIES'])
+    policies_default     = tally(DATA['POLICIES'], 'systemDefault')
+    users_enabled        = tally(DATA['USERS'])
     rows = [
         ('Number of Assets',               RESULTS['summary']['count_of_assets']),
         ('',''),
         ('Number of Cloud Accounts',       len(DATA['ACCOUNTS'])),
         ('',''),
-        ('Cloud Accounts Disabled',        sum(x.get('enabled') == False for x in DATA['ACCOUNTS'])),
-        ('Cloud Accounts Enabled',         sum(x.get('enabled') == True for x in DATA['ACCOUNTS'])),
+        ('Cloud Accounts Disabled',        accounts_enabled[False]),
+        ('Cloud Accounts Enabled',         accounts_enabled[True]),
         ('',''),
-        ('Cloud Accounts AWS',             sum(x.get('cloudType').lower() == 'aws' for x in DATA['ACCOUNTS'])),
-        ('Cloud Accounts Azure',           sum(x.get('cloudType').lower() == 'azure' for x in DATA['ACCOUNTS'])),
-        ('Cloud Accounts Google',          sum(x.get('cloudType').lower() == 'gcp' for x in DATA['ACCOUNTS'])),
-        ('Cloud Accounts Alibaba',         sum(x.get('cloudType').lower() == 'alibaba_cloud' for x in DATA['ACCOUNTS'])),
-        ('Cloud Accounts Oracle',          sum(x.get('cloudType').lower() == 'oci' for x in DATA['ACCOUNTS'])),
+        ('Cloud Accounts AWS',             accounts_cloud_types['aws']),
+        ('Cloud Accounts Azure',           accounts_cloud_types['azure']),
+        ('Cloud Accounts Google',          accounts_cloud_types['gcp']),
+        ('Cloud Accounts Alibaba',         accounts_cloud_types['alibaba_cloud']),
+        ('Cloud Accounts Oracle',          accounts_cloud_types['oci']),
         ('',''),
         ('Number of Cloud Account Groups', len(DATA['GROUPS'])),
         ('',''),
         ('Number of Alert Rules',          len(DATA['RULES'])),
         ('',''),
-        ('Alert Rules Disabled',           sum(x.get('enabled') == False for x in DATA['RULES'])),
-        ('Alert Rules Enabled',            sum(x.get('enabled') == True for x in DATA['RULES'])),
+        ('Alert Rules Disabled',           rules_enabled[False]),
+        ('Alert Rules Enabled',            rules_enabled[True]),
         ('',''),
         ('Number of Integrations',         len(DATA['INTEGRATIONS'])),
         ('',''),
-        ('Integrations Disabled',          sum(x.get('enabled') == False for x in DATA['INTEGRATIONS'])),
-        ('Integrations Enabled',           sum(x.get('enabled') == True for x in DATA['INTEGRATIONS'])),
+        ('Integrations Disabled',          integrations_enabled[False]),
+        ('Integrations Enabled',           integrations_enabled[True]),
         ('',''),
         ('Number of Policies',             len(DATA['POLICIES'])),
         ('',''),
-        ('Policies Disabled',              sum(x.get('enabled') == False for x in DATA['POLICIES'])),
-        ('Policies Enabled',               sum(x.get('enabled') == True for x in DATA['POLICIES'])),
+        ('Policies Disabled',              policies_enabled[False]),
+        ('Policies Enabled',               policies_enabled[True]),
         ('',''),
-        ('Policies Custom',                sum(x.get('systemDefault') == False for x in DATA['POLICIES'])),
-        ('Policies Default',               sum(x.get('systemDefault') == True for x in DATA['POLICIES'])),
+        ('Policies Custom',                policies_default[False]),
+        ('Policies Default',               policies_default[True]),
         ('',''),
         ('Number of Users',                len(DATA['USERS'])),
         ('',''),
-        ('Users Disabled',                 sum(x.get('enabled') == False for x in DATA['USERS'])),
-        ('Users Enabled',                  sum(x.get('enabled') == True for x in DATA['USERS'])),
+        ('Users Disabled',                 users_enabled[False]),
+        ('Users Enabled',                  users_enabled[True]),
     ]
     if CONFIG['SUPPORT_API_MODE']:
         rows.append(('',''))
         rows.append(('Data Collected using the Support API',''))
-    write_sheet(panda_writer, 'Utilization Summary', rows)
+    write_sheet(workbook, 'Utilization Summary', rows)
 
 ##
 
-def output_alerts_by_compliance_standard(panda_writer):
+def output_alerts_by_compliance_standard(workbook):
     output('Saving Alerts by Compliance Standard Worksheet(s)')
     output()
-    rows = []
-    rows.append(('Compliance Standard', 'Alerts Critical', 'Alerts High', 'Alerts Medium', 'Alerts Low', 'Alerts Informational'))
+    header = [('Compliance Standard', 'Alerts Critical', 'Alerts High', 'Alerts Medium', 'Alerts Low', 'Alerts Informational')]
     if CONFIG['SUPPORT_API_MODE']:
-        for compliance_standard_name in sorted(RESULTS['compliance_standards_from_policies']):
-            alert_count_critical      = RESULTS['compliance_standards_from_policies'][compliance_standard_name]['critical']
-            alert_count_high          = RESULTS['compliance_standards_from_policies'][compliance_standard_name]['high']
-            alert_count_medium        = RESULTS['compliance_standards_from_policies'][compliance_standard_name]['medium']
-            alert_count_low           = RESULTS['compliance_standards_from_policies'][compliance_standard_name]['low']
-            alert_count_informational = RESULTS['compliance_standards_from_policies'][compliance_standard_name]['informational']
-            rows.append((compliance_standard_name, alert_count_critical, alert_count_high, alert_count_medium, alert_count_low, alert_count_informational))
-        write_sheet(panda_writer, 'Open Alerts by Standard', rows)
+        write_sheet(workbook, 'Open Alerts by Standard', chain(header, standards_rows(RESULTS['compliance_standards_from_policies'])))
     else:
-        for compliance_standard_name in sorted(RESULTS['compliance_standards_from_alerts']):
-            alert_count_critical      = RESULTS['compliance_standards_from_alerts'][compliance_standard_name]['critical']
-            alert_count_high          = RESULTS['compliance_standards_from_alerts'][compliance_standard_name]['high']
-            alert_count_medium        = RESULTS['compliance_standards_from_alerts'][compliance_standard_name]['medium']
-            alert_count_low           = RESULTS['compliance_standards_from_alerts'][compliance_standard_name]['low']
-            alert_count_informational = RESULTS['compliance_standards_from_alerts'][compliance_standard_name]['informational']
-            rows.append((compliance_standard_name, alert_count_critical, alert_count_high, alert_count_medium, alert_count_low, alert_count_informational))
-        rows.append((''))
-        rows.append((''))
-        rows.append(('Time Range: %s' % CONFIG['TIME_RANGE_LABEL'], ''))
-        write_sheet(panda_writer, 'Alerts by Standard', rows)
+        footer = [(''), (''), ('Time Range: %s' % CONFIG['TIME_RANGE_LABEL'], '')]
+        write_sheet(workbook, 'Alerts by Standard', chain(header, standards_rows(RESULTS['compliance_standards_from_alerts']), footer))
+
+# Build the rows of the Alerts by Compliance Standard worksheets, sorting the Compliance Standards once.
+
+def standards_rows(standards_counts):
+    return [(compliance_standard_name, counts['critical'], counts['high'], counts['medium'], counts['low'], counts['informational']) for compliance_standard_name, counts in sorted(standards_counts.items())]
 
 ##
 
-def output_alerts_by_policy(panda_writer):
+def output_alerts_by_policy(workbook):
     output('Saving Alerts by Policy Worksheet(s)')
     output()
-    rows = []
-    rows.append(('Policy', 'UPI', 'UPI Group', 'Default', 'Alert Count', 'Enabled', 'Severity', 'Type', 'SubTypes', 'Category', 'Class', 'Cloud Provider', 'With IAC', 'With Remediation', 'Labels', 'Compliance Standards'))
+    header = [('Policy', 'UPI', 'UPI Group', 'Default', 'Alert Count', 'Enabled', 'Severity', 'Type', 'SubTypes', 'Category', 'Class', 'Cloud Provider', 'With IAC', 'With Remediation', 'Labels', 'Compliance Standards')]
     if CONFIG['SUPPORT_API_MODE']:
-        # Consider replacing sorted(RESULTS['policies_by_name']) with sorted(RESULTS['policies'], key=lambda x: (RESULTS['policies'][x]['name'])
-        for policy_name in sorted(RESULTS['policies_by_name']):
-            this_policy_id        = RESULTS['policies_by_name'][policy_name]['policyId']
-            policy_upi            = RESULTS['policies'][this_policy_id]['policyUpi']
-            policy_upi_group      = upi_group(policy_upi)
-            policy_default        = RESULTS['policies'][this_policy_id]['policySystemDefault']
-            policy_alert_count    = RESULTS['policies'][this_policy_id]['alertCount']
-            policy_enabled        = RESULTS['policies'][this_policy_id]['policyEnabled']
-            policy_severity       = RESULTS['policies'][this_policy_id]['policySeverity'].title()
-            policy_subtypes       = ', '.join(RESULTS['policies'][this_policy_id]['policySubTypes']).upper()
-            policy_type           = RESULTS['policies'][this_policy_id]['policyType'].title()
-            policy_category       = RESULTS['policies'][this_policy_id]['policyCategory'].title()
-            policy_class          = RESULTS['policies'][this_policy_id]['policyClass'].title()
-            policy_cloud_type     = RESULTS['policies'][this_policy_id]['policyCloudType'].upper()
-            policy_is_shiftable   = RESULTS['policies'][this_policy_id]['policyShiftable']
-            policy_is_remediable  = RESULTS['policies'][this_policy_id]['policyRemediable']
-            policy_labels         = ', '.join(RESULTS['policies'][this_policy_id]['policyLabels'])
-            policy_standards_list = ', '.join(map(str, RESULTS['policies'][this_policy_id]['complianceStandards']))
-            rows.append((policy_name, policy_upi, policy_upi_group, policy_default, policy_alert_count, policy_enabled, policy_severity, policy_type, policy_subtypes, policy_category, policy_class, policy_cloud_type, policy_is_shiftable, policy_is_remediable, policy_labels, policy_standards_list))
-        write_sheet(panda_writer, 'Open Alerts by Policy', rows)
+        write_sheet(workbook, 'Open Alerts by Policy', chain(header, policy_rows(RESULTS['policies_by_name'])))
+    else:
+        footer = [(''), (''), ('Time Range: %s' % CONFIG['TIME_RANGE_LABEL'], '')]
+        # Not RESULTS['policies'][this_policy_id]['openAlertsCount']
+        write_sheet(workbook, 'Alerts by Policy', chain(header, policy_rows(RESULTS['policies_from_alerts'], alert_counts_from_alerts=True), footer))
+
+# Build (an iterator of) the rows of the Alerts by Policy worksheets from a DataFrame, formatting each column in bulk instead of each Policy.
+
+def policy_rows(policies_by_name, alert_counts_from_alerts=False):
+    if not policies_by_name:
+        return ()
+    sorted_policies = sorted(policies_by_name.items())
+    policy_names = [policy_name for policy_name, this_policy in sorted_policies]
+    policy_ids   = [this_policy['policyId'] for policy_name, this_policy in sorted_policies]
+    policy_frame = RESULTS['policy_frame'].loc[policy_ids]
+    if alert_counts_from_alerts:
+        alert_counts = [this_policy['alertCount'] for policy_name, this_policy in sorted_policies]
     else:
-        for policy_name in sorted(RESULTS['policies_from_alerts']):
-            this_policy_id        = RESULTS['policies_from_alerts'][policy_name]['policyId']
-            policy_upi            = RESULTS['policies'][this_policy_id]['policyUpi']
-            policy_upi_group      = upi_group(policy_upi)
-            policy_default        = RESULTS['policies'][this_policy_id]['policySystemDefault']
-            policy_alert_count    = RESULTS['policies_from_alerts'][policy_name]['alertCount'] # Not RESULTS['policies'][this_policy_id]['openAlertsCount']
-            policy_enabled        = RESULTS['policies'][this_policy_id]['policyEnabled']
-            policy_severity       = RESULTS['policies'][this_policy_id]['policySeverity'].title()
-            policy_type           = RESULTS['policies'][this_policy_id]['policyType'].title()
-            policy_subtypes       = ', '.join(RESULTS['policies'][this_policy_id]['policySubTypes']).upper()
-            policy_category       = RESULTS['policies'][this_policy_id]['policyCategory'].title()
-            policy_class          = RESULTS['policies'][this_policy_id]['policyClass'].title()
-            policy_cloud_type     = RESULTS['policies'][this_policy_id]['policyCloudType'].upper()
-            policy_is_shiftable   = RESULTS['policies'][this_policy_id]['policyShiftable']
-            policy_is_remediable  = RESULTS['policies'][this_policy_id]['policyRemediable']
-            policy_labels         = ', '.join(RESULTS['policies'][this_policy_id]['policyLabels'])
-            policy_standards_list = ', '.join(map(str, RESULTS['policies'][this_policy_id]['complianceStandards']))
-            rows.append((policy_name, policy_upi, policy_upi_group, policy_default, policy_alert_count, policy_enabled, policy_severity, policy_type, policy_subtypes, policy_category, policy_class, policy_cloud_type, policy_is_shiftable, policy_is_remediable, policy_labels, policy_standards_list))
-        rows.append((''))
-        rows.append((''))
-        rows.append(('Time Range: %s' % CONFIG['TIME_RANGE_LABEL'], ''))
-        write_sheet(panda_writer, 'Alerts by Policy', rows)
+        alert_counts = policy_frame['alertCount'].tolist()
+    columns = (
+        policy_names,
+        policy_frame['policyUpi'].tolist(),
+        policy_frame['policyUpi'].map(upi_group).tolist(),
+        policy_frame['policySystemDefault'].tolist(),
+        alert_counts,
+        policy_frame['policyEnabled'].tolist(),
+        policy_frame['policySeverity'].str.title().tolist(),
+        policy_frame['policyType'].str.title().tolist(),
+        policy_frame['policySubTypes'].map(', '.join).str.upper().tolist(),
+        policy_frame['policyCategory'].str.title().tolist(),
+        policy_frame['policyClass'].str.title().tolist(),
+        policy_frame['policyCloudType'].str.upper().tolist(),
+        policy_frame['policyShiftable'].tolist(),
+        policy_frame['policyRemediable'].tolist(),
+        policy_frame['policyLabels'].map(', '.join).tolist(),
+        policy_frame['complianceStandards'].map(lambda standards: ', '.join(map(str, standards))).tolist(),
+    )
+    return zip(*columns)
 
 ##
 
-def output_alerts_summary(panda_writer):
+def output_alerts_summary(workbook):
     output('Saving Alerts Summary Worksheet(s)')
     output()
     if CONFIG['SUPPORT_API_MODE']:
@@ -1022,7 +1154,7 @@ def output_alerts_summary(panda_writer):
             ('Open Alerts Generated by OCI Policies',            RESULTS['alert_counts_from_policies']['cloud_type']['oci']),
             ('Open Alerts Generated by Cross-Cloud Policies',    RESULTS['alert_counts_from_policies']['cloud_type']['all']),
         ]
-        write_sheet(panda_writer, 'Open Alerts Summary', rows)
+        write_sheet(workbook, 'Open Alerts Summary', rows)
     else:
         rows = [
             ('Number of Assets with Alerts',                RESULTS['summary']['count_of_resources_with_alerts_from_alerts']),
@@ -1094,12 +1226,11 @@ def output_alerts_summary(panda_writer):
             ('',''),
             ('Time Range: %s' % CONFIG['TIME_RANGE_LABEL'], ''),
         ]
-        write_sheet(panda_writer, 'Alerts Summary', rows)
+        write_sheet(workbook, 'Alerts Summary', rows)
         rows = []
         rows.append(('Deleted Policy', 'Alert Count'))
-        for this_policy_id in sorted(RESULTS['deleted_policies_from_alerts']):
-            rows.append((this_policy_id, RESULTS['deleted_policies_from_alerts'][this_policy_id]))
-        write_sheet(panda_writer, 'Deleted Policies', rows)
+        rows.extend(sorted(RESULTS['deleted_policies_from_alerts'].items()))
+        write_sheet(workbook, 'Deleted Policies', rows)
 
 ##########################################################################################
 ##########################################################################################
@@ -1111,12 +1242,21 @@ def output_alerts_summary(panda_writer):
 # except CONFIG['PRISMA_API_HEADERS']['x-redlock-auth'] and CONFIG['SUPPORT_API_MODE'] are added/updated later.
 CONFIG = configure(argz)
 
+# This is shared by all API calls.
+SESSION = create_session()
+
+# This is shared by all queries, when the diskcache library is available.
+CACHE = Cache(CONFIG['CACHE_DIRECTORY']) if Cache and CONFIG['RUN_MODE'] in ['collect', 'auto'] else None
+
 # This is a constant after it has been initially populated by read_collected_data().
 DATA = {}
 
 # This is not a constant, just capitalized for visibility.
 RESULTS = {}
 
+# This holds the (lazily parsed) Alerts document referenced by DATA['ALERTS'].
+ALERTS_PARSER = simdjson.Parser() if simdjson else None
+
 if CONFIG['RUN_MODE'] in ['collect', 'auto']:
     output('Collecting Data')
     output()
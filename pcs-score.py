@@ -438,7 +438,7 @@ def process_policies(policies):
             RESULTS['alert_counts_from_policies']['feature']['shiftable']          += RESULTS['policies'][this_policy_id]['alertCount']
         if RESULTS['policies'][this_policy_id]['policyShiftableRemediable']:
             RESULTS['alert_counts_from_policies']['feature']['remediable_and_shiftable'] += RESULTS['policies'][this_policy_id]['alertCount']
-        if RESULTS['policies'][this_policy_id]['policySystemDefault'] == True:
+        if RESULTS['policies'][this_policy_id]['policySystemDefault'] is True:
             RESULTS['alert_counts_from_policies']['mode']['default']               += RESULTS['policies'][this_policy_id]['alertCount']
         else:
             RESULTS['alert_counts_from_policies']['mode']['custom']                += RESULTS['policies'][this_policy_id]['alertCount']
@@ -479,7 +479,7 @@ def process_alerts(alerts):
     else:
         for this_alert in alerts:
             this_policy_id = this_alert['policy']['policyId']
-            if this_alert['policy']['systemDefault'] == True:
+            if this_alert['policy']['systemDefault'] is True:
                 RESULTS['alert_counts_from_alerts']['mode']['default'] += 1
             else:
                 RESULTS['alert_counts_from_alerts']['mode']['custom']  += 1
@@ -514,7 +514,7 @@ def process_alerts(alerts):
             RESULTS['policies_from_alerts'][policy_name]['alertCount'] += 1
             RESULTS['policy_counts_from_alerts']['severity'][RESULTS['policies'][this_policy_id]['policySeverity']] += 1
             RESULTS['policy_counts_from_alerts']['type'][RESULTS['policies'][this_policy_id]['policyType']] += 1
-            if RESULTS['policies'][this_policy_id]['policyEnabled'] == False:
+            if RESULTS['policies'][this_policy_id]['policyEnabled'] is False:
                 RESULTS['disabled_policies_from_alerts'].setdefault(policy_name, 0)
                 RESULTS['disabled_policies_from_alerts'][policy_name] += 1
                 RESULTS['alert_counts_from_alerts']['policy']['disabled'] += 1